@@ -109,11 +109,12 @@ try:
 
         patch_all(**EXTRA_PATCHED_MODULES)
 
-    if "DATADOG_ENV" in os.environ:
-        tracer.set_tags({constants.ENV_KEY: os.environ["DATADOG_ENV"]})
+    env = os.environ.get("DATADOG_ENV")
+    if env is not None:
+        tracer.set_tags({constants.ENV_KEY: env})
 
-    if "DD_TRACE_GLOBAL_TAGS" in os.environ:
-        env_tags = os.getenv("DD_TRACE_GLOBAL_TAGS")
+    env_tags = os.environ.get("DD_TRACE_GLOBAL_TAGS")
+    if env_tags is not None:
         tracer.set_tags(parse_tags_str(env_tags))
 
     # Check for and import any sitecustomize that would have normally been used
@@ -70,7 +70,10 @@ def _default_handle_exception_span(exc, span):
 def span_from_scope(scope):
     # type: (Mapping[str, Any]) -> Optional[Span]
     """Retrieve the top-level ASGI span from the scope."""
-    return scope.get("datadog", {}).get("request_span")
+    datadog = scope.get("datadog")
+    if datadog is None:
+        return None
+    return datadog.get("request_span")
 
 
 class TraceMiddleware:
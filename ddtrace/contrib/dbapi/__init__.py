@@ -1,7 +1,11 @@
 """
 Generic dbapi tracing code.
 """
-import six
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from six import integer_types
 
 from ddtrace import config
 
@@ -11,6 +15,7 @@ from ...ext import SpanTypes
 from ...ext import sql
 from ...internal.logger import get_logger
 from ...pin import Pin
+from ...pin import _DD_PIN_PROXY_NAME
 from ...utils import ArgumentError
 from ...utils import get_argument_value
 from ...vendor import wrapt
@@ -20,6 +25,13 @@ from ..trace_utils import iswrapped
 
 log = get_logger(__name__)
 
+# Shared, read-only tags used by calls that do not add any extra tag, to avoid
+# allocating a new dict per traced call.
+_EMPTY_TAGS = {}  # type: Dict[str, Any]
+_EXECUTEMANY_TAGS = {"sql.executemany": "true"}
+# Resolve the enum value once instead of on every traced call.
+_SQL_SPAN_TYPE = SpanTypes.SQL.value
+
 
 config._add(
     "dbapi2",
@@ -52,37 +64,48 @@ class TracedCursor(wrapt.ObjectProxy):
         :param kwargs: The args that will be passed as kwargs to the wrapped method
         :return: The result of the wrapped method invocation
         """
-        pin = Pin.get_from(self)
+        pin = _get_pin(self)
         if not pin or not pin.enabled():
             return method(*args, **kwargs)
         measured = name == self._self_datadog_name
 
         with pin.tracer.trace(
-            name, service=ext_service(pin, self._self_config), resource=resource, span_type=SpanTypes.SQL
+            name, service=ext_service(pin, self._self_config), resource=resource, span_type=_SQL_SPAN_TYPE
         ) as s:
             if measured:
                 s.set_tag(SPAN_MEASURED_KEY)
             # No reason to tag the query since it is set as the resource by the agent. See:
             # https://github.com/DataDog/datadog-trace-agent/blob/bda1ebbf170dd8c5879be993bdd4dbae70d10fda/obfuscate/sql.go#L232
-            s.set_tags(pin.tags)
-            s.set_tags(extra_tags)
+            # Most pins and calls carry no tags: skip the method calls altogether
+            if pin.tags:
+                s.set_tags(pin.tags)
+            if extra_tags:
+                s.set_tags(extra_tags)
 
-            # set analytics sample rate if enabled but only for non-FetchTracedCursor
-            if not isinstance(self, FetchTracedCursor):
-                s.set_tag(ANALYTICS_SAMPLE_RATE_KEY, self._self_config.get_analytics_sample_rate())
+            self._set_analytics_sample_rate(s)
 
             try:
                 return method(*args, **kwargs)
             finally:
-                row_count = self.__wrapped__.rowcount
-                s.set_metric("db.rowcount", row_count)
-                # Necessary for django integration backward compatibility. Django integration used to provide its own
-                # implementation of the TracedCursor, which used to store the row count into a tag instead of
-                # as a metric. Such custom implementation has been replaced by this generic dbapi implementation and
-                # this tag has been added since.
-                # Check row count is an integer type to avoid comparison type error
-                if isinstance(row_count, six.integer_types) and row_count >= 0:
-                    s.set_tag(sql.ROWS, row_count)
+                # The row count is only useful on spans that are going to be sent, and reading it is not free with
+                # some drivers (e.g. server-side cursors), so skip it on spans that were sampled out.
+                # DEV: `span.sampled` is only False when a legacy client-side sampler (e.g. `RateSampler`) dropped
+                # the trace. With the default `DatadogSampler` spans are always marked as sampled and the decision
+                # is carried by the sampling priority, so the row count is always read.
+                if s.sampled:
+                    row_count = self.__wrapped__.rowcount
+                    s.set_metric("db.rowcount", row_count)
+                    # Necessary for django integration backward compatibility. Django integration used to provide its
+                    # own implementation of the TracedCursor, which used to store the row count into a tag instead of
+                    # as a metric. Such custom implementation has been replaced by this generic dbapi implementation
+                    # and this tag has been added since.
+                    # Check row count is an integer type to avoid comparison type error
+                    if isinstance(row_count, integer_types) and row_count >= 0:
+                        s.set_tag(sql.ROWS, row_count)
+
+    def _set_analytics_sample_rate(self, span):
+        """Set the analytics sample rate on the span if enabled"""
+        span.set_tag(ANALYTICS_SAMPLE_RATE_KEY, self._self_config.get_analytics_sample_rate())
 
     def executemany(self, query, *args, **kwargs):
         """Wraps the cursor.executemany method"""
@@ -93,13 +116,7 @@ class TracedCursor(wrapt.ObjectProxy):
         # FIXME[matt] properly handle kwargs here. arg names can be different
         # with different libs.
         return self._trace_method(
-            self.__wrapped__.executemany,
-            self._self_datadog_name,
-            query,
-            {"sql.executemany": "true"},
-            query,
-            *args,
-            **kwargs
+            self.__wrapped__.executemany, self._self_datadog_name, query, _EXECUTEMANY_TAGS, query, *args, **kwargs
         )
 
     def execute(self, query, *args, **kwargs):
@@ -109,12 +126,14 @@ class TracedCursor(wrapt.ObjectProxy):
         # Always return the result as-is
         # DEV: Some libraries return `None`, others `int`, and others the cursor objects
         #      These differences should be overridden at the integration specific layer (e.g. in `sqlite3/patch.py`)
-        return self._trace_method(self.__wrapped__.execute, self._self_datadog_name, query, {}, query, *args, **kwargs)
+        return self._trace_method(
+            self.__wrapped__.execute, self._self_datadog_name, query, _EMPTY_TAGS, query, *args, **kwargs
+        )
 
     def callproc(self, proc, *args):
         """Wraps the cursor.callproc method"""
         self._self_last_execute_operation = proc
-        return self._trace_method(self.__wrapped__.callproc, self._self_datadog_name, proc, {}, proc, *args)
+        return self._trace_method(self.__wrapped__.callproc, self._self_datadog_name, proc, _EMPTY_TAGS, proc, *args)
 
     def __enter__(self):
         # previous versions of the dbapi didn't support context managers. let's
@@ -133,35 +152,66 @@ class FetchTracedCursor(TracedCursor):
     We do not trace these functions by default since they can get very noisy (e.g. `fetchone` with 100k rows).
     """
 
+    def __init__(self, cursor, pin, cfg):
+        super(FetchTracedCursor, self).__init__(cursor, pin, cfg)
+        # span names are fixed for the lifetime of the cursor
+        self._self_fetchone_name = self._self_datadog_name + ".fetchone"
+        self._self_fetchall_name = self._self_datadog_name + ".fetchall"
+        self._self_fetchmany_name = self._self_datadog_name + ".fetchmany"
+
+    def _set_analytics_sample_rate(self, span):
+        # Spans from cursors tracing fetch* methods are not used for analytics
+        pass
+
     def fetchone(self, *args, **kwargs):
         """Wraps the cursor.fetchone method"""
-        span_name = "{}.{}".format(self._self_datadog_name, "fetchone")
         return self._trace_method(
-            self.__wrapped__.fetchone, span_name, self._self_last_execute_operation, {}, *args, **kwargs
+            self.__wrapped__.fetchone,
+            self._self_fetchone_name,
+            self._self_last_execute_operation,
+            _EMPTY_TAGS,
+            *args,
+            **kwargs
         )
 
     def fetchall(self, *args, **kwargs):
         """Wraps the cursor.fetchall method"""
-        span_name = "{}.{}".format(self._self_datadog_name, "fetchall")
         return self._trace_method(
-            self.__wrapped__.fetchall, span_name, self._self_last_execute_operation, {}, *args, **kwargs
+            self.__wrapped__.fetchall,
+            self._self_fetchall_name,
+            self._self_last_execute_operation,
+            _EMPTY_TAGS,
+            *args,
+            **kwargs
         )
 
     def fetchmany(self, *args, **kwargs):
         """Wraps the cursor.fetchmany method"""
-        span_name = "{}.{}".format(self._self_datadog_name, "fetchmany")
         # We want to trace the information about how many rows were requested. Note that this number may be larger
         # the number of rows actually returned if less then requested are available from the query.
         size_tag_key = "db.fetch.size"
 
-        try:
-            extra_tags = {size_tag_key: get_argument_value(args, kwargs, 0, "size")}
-        except ArgumentError:
+        extra_tags = None
+        # DEV: most calls rely on the cursor's arraysize, so only look for an
+        # explicit size when arguments were given to avoid raising and catching
+        # an ArgumentError on every call.
+        if args or kwargs:
+            try:
+                extra_tags = {size_tag_key: get_argument_value(args, kwargs, 0, "size")}
+            except ArgumentError:
+                pass
+
+        if extra_tags is None:
             default_array_size = getattr(self.__wrapped__, "arraysize", None)
-            extra_tags = {size_tag_key: default_array_size} if default_array_size else {}
+            extra_tags = {size_tag_key: default_array_size} if default_array_size else _EMPTY_TAGS
 
         return self._trace_method(
-            self.__wrapped__.fetchmany, span_name, self._self_last_execute_operation, extra_tags, *args, **kwargs
+            self.__wrapped__.fetchmany,
+            self._self_fetchmany_name,
+            self._self_last_execute_operation,
+            extra_tags,
+            *args,
+            **kwargs
         )
 
 
@@ -179,6 +229,8 @@ class TracedConnection(wrapt.ObjectProxy):
         super(TracedConnection, self).__init__(conn)
         name = _get_vendor(conn)
         self._self_datadog_name = "{}.connection".format(name)
+        self._self_commit_name = self._self_datadog_name + ".commit"
+        self._self_rollback_name = self._self_datadog_name + ".rollback"
         db_pin = pin or Pin(service=name, app=name)
         db_pin.onto(self)
         # wrapt requires prefix of `_self` for attributes that are only in the
@@ -219,7 +271,7 @@ class TracedConnection(wrapt.ObjectProxy):
             if iswrapped(r):
                 return r
             else:
-                pin = Pin.get_from(self)
+                pin = _get_pin(self)
                 if not pin:
                     return r
                 return self._self_cursor_cls(r, pin, self._self_config)
@@ -229,30 +281,56 @@ class TracedConnection(wrapt.ObjectProxy):
             return r
 
     def _trace_method(self, method, name, extra_tags, *args, **kwargs):
-        pin = Pin.get_from(self)
+        pin = _get_pin(self)
         if not pin or not pin.enabled():
             return method(*args, **kwargs)
 
         with pin.tracer.trace(name, service=ext_service(pin, self._self_config)) as s:
-            s.set_tags(pin.tags)
-            s.set_tags(extra_tags)
+            if pin.tags:
+                s.set_tags(pin.tags)
+            if extra_tags:
+                s.set_tags(extra_tags)
 
             return method(*args, **kwargs)
 
     def cursor(self, *args, **kwargs):
         cursor = self.__wrapped__.cursor(*args, **kwargs)
-        pin = Pin.get_from(self)
+        if isinstance(cursor, TracedCursor):
+            # The cursor is already traced, e.g. when the wrapped connection
+            # is itself traced: do not trace its queries twice.
+            return cursor
+        pin = _get_pin(self)
         if not pin:
             return cursor
         return self._self_cursor_cls(cursor, pin, self._self_config)
 
     def commit(self, *args, **kwargs):
-        span_name = "{}.{}".format(self._self_datadog_name, "commit")
-        return self._trace_method(self.__wrapped__.commit, span_name, {}, *args, **kwargs)
+        return self._trace_method(self.__wrapped__.commit, self._self_commit_name, _EMPTY_TAGS, *args, **kwargs)
 
     def rollback(self, *args, **kwargs):
-        span_name = "{}.{}".format(self._self_datadog_name, "rollback")
-        return self._trace_method(self.__wrapped__.rollback, span_name, {}, *args, **kwargs)
+        return self._trace_method(self.__wrapped__.rollback, self._self_rollback_name, _EMPTY_TAGS, *args, **kwargs)
+
+
+def _get_pin(proxy):
+    # type: (wrapt.ObjectProxy) -> Optional[Pin]
+    """Return the pin attached to a traced dbapi proxy.
+
+    DEV: this is called for every traced call. ``Pin.get_from`` first probes
+    the proxy for a ``__getddpin__`` hook, which falls through to the wrapped
+    driver object, so read the attribute set by ``Pin.onto`` directly. A pin
+    the proxy does not own (e.g. a connection pin that was attached to one of
+    its cursors) still goes through ``Pin.get_from`` so that it is cloned.
+    """
+    pin = getattr(proxy, _DD_PIN_PROXY_NAME, None)
+    if pin is not None and pin._target != id(proxy):
+        return Pin.get_from(proxy)
+    return pin
+
+
+# Normalized vendor names by top-level module name. Keyed by module name rather
+# than by connection class so that dynamically created classes are not kept
+# alive and the cache stays bounded.
+_VENDORS = {}  # type: Dict[str, str]
 
 
 def _get_vendor(conn):
@@ -264,8 +342,11 @@ def _get_vendor(conn):
     except Exception:
         log.debug("couldn't parse module name", exc_info=True)
         name = "sql"
-    return sql.normalize_vendor(name)
+    vendor = _VENDORS.get(name)
+    if vendor is None:
+        vendor = _VENDORS[name] = sql.normalize_vendor(name)
+    return vendor
 
 
 def _get_module_name(conn):
-    return conn.__class__.__module__.split(".")[0]
+    return conn.__class__.__module__.partition(".")[0]
@@ -28,16 +28,6 @@ def is_enabled(config):
     return config.getoption("ddtrace") or config.getini("ddtrace")
 
 
-def _extract_span(item):
-    """Extract span from `pytest.Item` instance."""
-    return getattr(item, "_datadog_span", None)
-
-
-def _store_span(item, span):
-    """Store span at `pytest.Item` instance."""
-    setattr(item, "_datadog_span", span)
-
-
 def _extract_repository_name(repository_url):
     # type: (str) -> str
     """Extract repository name from repository url."""
@@ -94,7 +84,7 @@ def pytest_sessionfinish(session, exitstatus):
 def ddspan(request):
     pin = Pin.get_from(request.config)
     if pin:
-        return _extract_span(request.node)
+        return getattr(request.node, "_datadog_span", None)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -143,10 +133,9 @@ def pytest_runtest_protocol(item, nextitem):
                     log.warning("Failed to encode %r", param_name, exc_info=True)
             span.set_tag(test.PARAMETERS, json.dumps(parameters))
 
-        markers = [marker.kwargs for marker in item.iter_markers(name="dd_tags")]
-        for tags in markers:
-            span.set_tags(tags)
-        _store_span(item, span)
+        for marker in item.iter_markers(name="dd_tags"):
+            span.set_tags(marker.kwargs)
+        item._datadog_span = span
 
         yield
 
@@ -161,7 +150,7 @@ def pytest_runtest_makereport(item, call):
     """Store outcome for tracing."""
     outcome = yield
 
-    span = _extract_span(item)
+    span = getattr(item, "_datadog_span", None)
     if span is None:
         return
 
@@ -172,8 +161,9 @@ def pytest_runtest_makereport(item, call):
         return
 
     result = outcome.get_result()
-    xfail = hasattr(result, "wasxfail") or "xfail" in result.keywords
-    has_skip_keyword = any(x in result.keywords for x in ["skip", "skipif", "skipped"])
+    keywords = result.keywords
+    xfail = hasattr(result, "wasxfail") or "xfail" in keywords
+    has_skip_keyword = "skip" in keywords or "skipif" in keywords or "skipped" in keywords
 
     if result.skipped:
         if xfail and not has_skip_keyword:
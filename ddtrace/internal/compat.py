@@ -78,6 +78,9 @@ def is_integer(obj):
     # <class 'bool'>
     # >>> isinstance(True, int)
     # True
+    # DEV: Exact type check first to skip the MRO walk for plain integers
+    if type(obj) in six.integer_types:
+        return True
     return isinstance(obj, six.integer_types) and not isinstance(obj, bool)
 
 
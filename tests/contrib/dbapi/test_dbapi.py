@@ -6,6 +6,8 @@ from ddtrace.constants import ANALYTICS_SAMPLE_RATE_KEY
 from ddtrace.contrib.dbapi import FetchTracedCursor
 from ddtrace.contrib.dbapi import TracedConnection
 from ddtrace.contrib.dbapi import TracedCursor
+from ddtrace.ext import sql
+from ddtrace.sampler import RateSampler
 from ddtrace.settings.integration import IntegrationConfig
 from ddtrace.span import Span
 from tests.utils import TracerTestCase
@@ -201,6 +203,19 @@ class TestTracedCursor(TracerTestCase):
         span = tracer.pop()[0]  # type: Span
         assert span.service == "cfg-service"
 
+    def test_cfg_service_updated(self):
+        cursor = self.cursor
+        cursor.rowcount = 0
+        pin = Pin(None, app="my_app", tracer=self.tracer)
+        cfg = IntegrationConfig(None, "db-test", service="cfg-service")
+        traced_cursor = TracedCursor(cursor, pin, cfg)
+
+        # Changes to the integration config are honored by existing cursors
+        cfg.service = "new-cfg-service"
+        traced_cursor.execute("__query__")
+        span = self.pop_spans()[0]
+        assert span.service == "new-cfg-service"
+
     def test_default_service(self):
         cursor = self.cursor
         tracer = self.tracer
@@ -264,6 +279,41 @@ class TestTracedCursor(TracerTestCase):
         assert span.get_metric("db.rowcount") == 123, "Row count is set as a metric"
         assert span.get_metric("sql.rows") == 123, "Row count is set as a tag (for legacy django cursor replacement)"
 
+    def test_rowcount_not_read_when_sampled_out(self):
+        cursor = self.cursor
+        rowcount = mock.PropertyMock(return_value=123)
+        type(cursor).rowcount = rowcount
+        self.tracer.sampler = RateSampler(0.0)
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_cursor = TracedCursor(cursor, pin, {})
+
+        traced_cursor.execute("__query__")
+        rowcount.assert_not_called()
+
+    def test_pin_override(self):
+        cursor = self.cursor
+        cursor.rowcount = 0
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_cursor = TracedCursor(cursor, pin, {})
+        Pin.override(traced_cursor, service="overridden")
+
+        assert Pin.get_from(traced_cursor).service == "overridden"
+        traced_cursor.execute("__query__")
+        span = self.pop_spans()[0]
+        assert span.service == "overridden"
+
+    def test_pin_remove(self):
+        # DEV: use a spec so that the removed pin is not looked up on the mock
+        cursor = mock.Mock(spec=["execute", "rowcount"])
+        cursor.rowcount = 0
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_cursor = TracedCursor(cursor, pin, {})
+        Pin.get_from(traced_cursor).remove_from(traced_cursor)
+
+        assert Pin.get_from(traced_cursor) is None
+        traced_cursor.execute("__query__")
+        assert len(self.pop_spans()) == 0
+
     def test_cursor_analytics_default(self):
         cursor = self.cursor
         cursor.rowcount = 0
@@ -331,6 +381,26 @@ class TestFetchTracedCursor(TracerTestCase):
         assert "__result__" == traced_cursor.fetchmany("arg_1", kwarg1="kwarg1")
         cursor.fetchmany.assert_called_once_with("arg_1", kwarg1="kwarg1")
 
+    def test_fetchmany_size_tag(self):
+        cursor = self.cursor
+        cursor.rowcount = 0
+        cursor.arraysize = 42
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_cursor = FetchTracedCursor(cursor, pin, {})
+
+        traced_cursor.fetchmany()
+        assert self.pop_spans()[0].get_metric("db.fetch.size") == 42
+
+        traced_cursor.fetchmany(10)
+        assert self.pop_spans()[0].get_metric("db.fetch.size") == 10
+
+        traced_cursor.fetchmany(size=20)
+        assert self.pop_spans()[0].get_metric("db.fetch.size") == 20
+
+        cursor.arraysize = 0
+        traced_cursor.fetchmany()
+        assert self.pop_spans()[0].get_metric("db.fetch.size") is None
+
     def test_correct_span_names(self):
         cursor = self.cursor
         tracer = self.tracer
@@ -583,6 +653,79 @@ class TestTracedConnection(TracerTestCase):
         assert tracer.pop()[0].name == "mock.connection.rollback"
         connection.rollback.assert_called_with()
 
+    def test_pin_override(self):
+        connection = self.connection
+        connection.commit.return_value = None
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_connection = TracedConnection(connection, pin)
+        Pin.override(traced_connection, service="overridden")
+
+        traced_connection.commit()
+        assert self.pop_spans()[0].service == "overridden"
+
+        traced_connection.cursor().execute("__query__")
+        assert self.pop_spans()[0].service == "overridden"
+
+    def test_cursor_not_traced_twice(self):
+        cursor = mock.Mock()
+        cursor.rowcount = 0
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_connection = TracedConnection(TracedConnection(self.connection, pin), pin)
+        self.connection.cursor.return_value = cursor
+
+        traced_cursor = traced_connection.cursor()
+        assert traced_cursor.__wrapped__ is cursor
+        traced_cursor.execute("__query__")
+        assert len(self.pop_spans()) == 1
+
+    def test_pin_remove(self):
+        # DEV: use a spec so that the removed pin is not looked up on the mock
+        connection = mock.Mock(spec=["commit"])
+        connection.commit.return_value = None
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_connection = TracedConnection(connection, pin)
+        Pin.get_from(traced_connection).remove_from(traced_connection)
+
+        assert Pin.get_from(traced_connection) is None
+        traced_connection.commit()
+        assert len(self.pop_spans()) == 0
+
+    def test_pin_not_shared_with_cursor(self):
+        connection = self.connection
+        connection.commit.return_value = None
+        connection.cursor.return_value.rowcount = 0
+        pin = Pin("pin_name", tracer=self.tracer, tags={"pin": "value"})
+        traced_connection = TracedConnection(connection, pin)
+        traced_cursor = traced_connection.cursor()
+        traced_connection.commit()
+        self.pop_spans()
+
+        # The connection pin was attached to the cursor, the connection must use its own copy
+        Pin.get_from(traced_cursor).tags["cursor"] = "value"
+        traced_connection.commit()
+        span = self.pop_spans()[0]
+        assert span.get_tag("pin") == "value"
+        assert span.get_tag("cursor") is None
+
+    def test_pin_remove_cursor(self):
+        cursor = mock.Mock()
+        # DEV: use a spec so that the removed pin is not looked up on the mock
+        connection = mock.Mock(spec=["cursor"])
+        connection.cursor.return_value = cursor
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_connection = TracedConnection(connection, pin)
+        Pin.get_from(traced_connection).remove_from(traced_connection)
+
+        assert traced_connection.cursor() is cursor
+
+    def test_vendor_cached(self):
+        with mock.patch.dict("ddtrace.contrib.dbapi._VENDORS", clear=True):
+            with mock.patch.object(sql, "normalize_vendor", wraps=sql.normalize_vendor) as normalize_vendor:
+                # DEV: every mock has its own class, the cache is keyed by module name
+                TracedConnection(mock.Mock())
+                TracedConnection(mock.Mock())
+        normalize_vendor.assert_called_once_with("mock")
+
     def test_connection_analytics_with_rate(self):
         with self.override_config("dbapi2", dict(analytics_enabled=True, analytics_sample_rate=0.5)):
             connection = self.connection
@@ -117,6 +117,7 @@ class TestPy2Py3Compat(object):
         (-1.0, False),
         (True, False),
         (False, False),
+        (type("IntSubclass", (int,), {})(1), True),
         (dict(), False),
         ([], False),
         (tuple(), False),